@@ -3,19 +3,39 @@ AI News Aggregator - FastAPI Backend
 Агрегатор новостей с SQLite базой данных (хранение 3 дня)
 """
 
-import json
+import hashlib
+import io
+import os
+import queue
 import sqlite3
 import asyncio
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 import feedparser
 import httpx
+import msgpack
+import orjson
 from fastapi import FastAPI, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
 
-app = FastAPI(title="AI News Aggregator")
+
+class ORJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый через orjson"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(title="AI News Aggregator", default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Пути к файлам
 BASE_DIR = Path(__file__).parent
@@ -26,6 +46,31 @@ STATIC_DIR = BASE_DIR / "static"
 # TTL для хранения новостей (3 дня)
 NEWS_TTL_DAYS = 3
 
+# Через сколько часов продлевать fetched_at новостей, всё ещё присутствующих в лентах
+# (с запасом меньше TTL, чтобы очистка их не удалила)
+STALE_AFTER_HOURS = 24
+
+# Размер порции при пакетной вставке новостей
+SAVE_BATCH_SIZE = 500
+
+# Перевод: размер порции строк на один поток, число потоков и размер кэша переводов
+TRANSLATE_CHUNK_SIZE = 5
+TRANSLATE_WORKERS = 4
+TRANSLATION_CACHE_SIZE = 4096
+
+# Интервал фоновой очистки устаревших новостей
+CLEANUP_INTERVAL_SECONDS = 3600
+
+# Колонки новости, которые отдаёт /api/news (все используются карточкой в интерфейсе)
+NEWS_COLUMNS = ("id", "source", "source_name", "title", "description", "url", "author", "published_at", "fetched_at")
+
+# Размер страницы /api/news
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# Количество соединений в пуле БД
+DB_POOL_SIZE = 4
+
 # Авторский пресет каналов
 AUTHOR_PRESET = {
     "subreddits": [
@@ -50,17 +95,71 @@ AUTHOR_PRESET = {
 # Монтируем статику
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
+# Общий HTTP-клиент: пул соединений переиспользуется между обновлениями
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=10
+)
 
-def get_db_connection():
-    """Получение соединения с БД"""
-    conn = sqlite3.connect(DB_FILE)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Закрытие HTTP-клиента при остановке"""
+    await http_client.aclose()
+
+
+# Пул долгоживущих соединений с БД
+_db_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+
+# Кэш значения metadata.last_updated
+_last_updated: Optional[str] = None
+
+# Фоновая задача очистки БД
+_janitor_task: Optional[asyncio.Task] = None
+
+# Текущее обновление новостей (одно на всех одновременных клиентов)
+_refresh_task: Optional[asyncio.Task] = None
+
+# Валидаторы HTTP-кэша лент {url: {"etag": ..., "lm": ..., "at": время получения}}
+# (строки etag:<url> / lm:<url> / at:<url> в metadata)
+_feed_validators: dict = {}
+# Валидаторы из последних ответов 200, ещё не сохранённые в БД
+_pending_validators: dict = {}
+
+
+def _connect() -> sqlite3.Connection:
+    """Открытие нового соединения с БД"""
+    # isolation_level=None: автокоммит, транзакции открываем явно через BEGIN
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    # Эти PRAGMA действуют только в рамках соединения
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
     return conn
 
 
+@contextmanager
+def get_db_connection():
+    """Получение соединения с БД из пула"""
+    conn = _db_pool.get()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        _db_pool.put(conn)
+
+
 def init_db():
     """Инициализация базы данных"""
-    conn = get_db_connection()
+    global _last_updated
+    conn = _connect()
+    # WAL: читатели не блокируются на время записи при обновлении.
+    # Режим сохраняется в самом файле БД, поэтому включаем его один раз
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS news (
             id TEXT PRIMARY KEY,
@@ -81,9 +180,20 @@ def init_db():
         )
     """)
     conn.execute("CREATE INDEX IF NOT EXISTS idx_news_fetched_at ON news(fetched_at)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_source ON news(source)")
-    conn.commit()
-    conn.close()
+    # idx_news_source(source) покрывается префиксом idx_news_source_pub
+    conn.execute("DROP INDEX IF EXISTS idx_news_source")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_source_pub ON news(source, published_at DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_news_pub ON news(published_at DESC)")
+    # Время последнего обновления держим в памяти, чтобы GET не ходил за ним в БД
+    row = conn.execute("SELECT value FROM metadata WHERE key = 'last_updated'").fetchone()
+    _last_updated = row["value"] if row else None
+    cursor = conn.execute("SELECT key, value FROM metadata WHERE key LIKE 'etag:%' OR key LIKE 'lm:%' OR key LIKE 'at:%'")
+    for row in cursor.fetchall():
+        kind, url = row["key"].split(":", 1)
+        _feed_validators.setdefault(url, {})[kind] = row["value"]
+    _db_pool.put(conn)
+    for _ in range(DB_POOL_SIZE - 1):
+        _db_pool.put(_connect())
     print("✅ SQLite database initialized")
 
 
@@ -91,215 +201,508 @@ def init_db():
 init_db()
 
 
+# Разобранный config.json в памяти: (mtime_ns, config)
+_config_cache: Optional[tuple] = None
+
+
 def load_config() -> dict:
-    """Загрузка конфигурации"""
-    if CONFIG_FILE.exists():
-        return json.loads(CONFIG_FILE.read_text())
-    return {
-        "subreddits": ["MachineLearning", "artificial"],
-        "rss_feeds": [],
-        "hackernews_keywords": ["AI", "GPT"],
-        "refresh_interval_minutes": 15
-    }
+    """Загрузка конфигурации (перечитывается только при изменении файла)"""
+    global _config_cache
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {
+            "subreddits": ["MachineLearning", "artificial"],
+            "rss_feeds": [],
+            "hackernews_keywords": ["AI", "GPT"],
+            "refresh_interval_minutes": 15
+        }
+    if _config_cache is None or _config_cache[0] != mtime:
+        _config_cache = (mtime, orjson.loads(CONFIG_FILE.read_bytes()))
+    return _config_cache[1]
 
 
 def save_config(config: dict):
     """Сохранение конфигурации"""
-    CONFIG_FILE.write_text(json.dumps(config, indent=2))
+    # Пишем во временный файл и атомарно подменяем, чтобы не прочитать его наполовину
+    tmp_file = CONFIG_FILE.with_suffix(".json.tmp")
+    tmp_file.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, CONFIG_FILE)
 
 
 def get_last_updated() -> Optional[str]:
-    """Получение времени последнего обновления"""
-    conn = get_db_connection()
-    cursor = conn.execute("SELECT value FROM metadata WHERE key = 'last_updated'")
-    row = cursor.fetchone()
-    conn.close()
-    return row["value"] if row else None
+    """Получение времени последнего обновления (из памяти, без обращения к БД)"""
+    return _last_updated
 
 
 def set_last_updated(timestamp: str):
     """Установка времени последнего обновления"""
-    conn = get_db_connection()
-    conn.execute(
-        "INSERT OR REPLACE INTO metadata (key, value) VALUES ('last_updated', ?)",
-        (timestamp,)
-    )
-    conn.commit()
-    conn.close()
+    global _last_updated
+    with get_db_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES ('last_updated', ?)",
+            (timestamp,)
+        )
+    _last_updated = timestamp
+
+
+def save_feed_validators(validators: dict):
+    """Сохранение ETag/Last-Modified лент"""
+    if not validators:
+        return
+    with get_db_connection() as conn:
+        conn.execute("BEGIN")
+        for url, values in validators.items():
+            conn.execute(
+                "DELETE FROM metadata WHERE key IN (?, ?, ?)",
+                (f"etag:{url}", f"lm:{url}", f"at:{url}")
+            )
+            conn.executemany(
+                "INSERT INTO metadata (key, value) VALUES (?, ?)",
+                [(f"{kind}:{url}", value) for kind, value in values.items()]
+            )
+        conn.execute("COMMIT")
+    _feed_validators.update(validators)
+
+
+def clear_feed_validators(urls: list):
+    """Сброс ETag/Last-Modified лент: следующий запрос заберёт их целиком"""
+    keys = [str(httpx.URL(url)) for url in urls]
+    if not keys:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(
+            "DELETE FROM metadata WHERE key IN (?, ?, ?)",
+            [(f"etag:{key}", f"lm:{key}", f"at:{key}") for key in keys]
+        )
+    for key in keys:
+        _feed_validators.pop(key, None)
+        _pending_validators.pop(key, None)
+
+
+def delete_blog_news(source_names: list):
+    """Удаление записей RSS-лент с указанными именами"""
+    if not source_names:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(
+            "DELETE FROM news WHERE source = 'blog' AND source_name = ?",
+            [(name,) for name in source_names]
+        )
+
+
+def stale_cutoff_iso() -> str:
+    """Граница «устаревших» данных: STALE_AFTER_HOURS назад.
+
+    Раньше неё пора обновить fetched_at у новостей, которые ещё есть в лентах, и перестать
+    доверять сохранённым ETag/Last-Modified.
+    """
+    return (datetime.now() - timedelta(hours=STALE_AFTER_HOURS)).isoformat()
 
 
 def save_news_items(items: list):
-    """Сохранение новостей в БД"""
-    conn = get_db_connection()
-    for item in items:
-        conn.execute("""
-            INSERT OR REPLACE INTO news 
-            (id, source, source_name, title, description, url, author, published_at, fetched_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            item["id"],
-            item["source"],
-            item.get("source_name"),
-            item["title"],
-            item.get("description"),
-            item["url"],
-            item.get("author"),
-            item.get("published_at"),
-            item["fetched_at"]
-        ))
-    conn.commit()
-    conn.close()
+    """Сохранение новостей в БД (пакетная вставка в одной транзакции)"""
+    items = iter(items)
+    stale_cutoff = stale_cutoff_iso()
+    with get_db_connection() as conn:
+        conn.execute("BEGIN")
+        # Каждая порция уходит в БД одним JSON-параметром и одним запросом через json_each.
+        # Уже сохранённые записи не перезаписываем на каждом обновлении: строка меняется,
+        # только если изменился заголовок или fetched_at старше STALE_AFTER_HOURS. Так новость,
+        # которая всё ещё есть в ленте, не удаляется очисткой, а строка переписывается
+        # не чаще раза в сутки
+        while chunk := list(islice(items, SAVE_BATCH_SIZE)):
+            conn.execute("""
+                INSERT INTO news 
+                (id, source, source_name, title, description, url, author, published_at, fetched_at)
+                SELECT
+                    json_extract(value, '$.id'),
+                    json_extract(value, '$.source'),
+                    json_extract(value, '$.source_name'),
+                    json_extract(value, '$.title'),
+                    json_extract(value, '$.description'),
+                    json_extract(value, '$.url'),
+                    json_extract(value, '$.author'),
+                    json_extract(value, '$.published_at'),
+                    json_extract(value, '$.fetched_at')
+                FROM json_each(?)
+                WHERE true
+                ON CONFLICT(id) DO UPDATE SET title = excluded.title, fetched_at = excluded.fetched_at
+                WHERE news.title != excluded.title OR news.fetched_at < ?
+            """, (orjson.dumps(chunk).decode(), stale_cutoff))
+        conn.execute("COMMIT")
 
 
 def clean_old_news():
     """Удаление новостей старше TTL"""
     cutoff = (datetime.now() - timedelta(days=NEWS_TTL_DAYS)).isoformat()
-    conn = get_db_connection()
-    cursor = conn.execute("DELETE FROM news WHERE fetched_at < ?", (cutoff,))
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.execute("DELETE FROM news WHERE fetched_at < ?", (cutoff,))
+        deleted = cursor.rowcount
     if deleted > 0:
         print(f"🧹 Cleaned {deleted} old news items")
 
 
-def get_news_from_db(source: Optional[str] = None) -> list:
-    """Получение новостей из БД"""
-    conn = get_db_connection()
-    if source:
-        cursor = conn.execute(
-            "SELECT * FROM news WHERE source = ? ORDER BY published_at DESC",
-            (source,)
-        )
-    else:
-        cursor = conn.execute("SELECT * FROM news ORDER BY published_at DESC")
-    
-    items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+async def _janitor():
+    """Периодическая очистка устаревших новостей вне обработки запросов"""
+    while True:
+        try:
+            await asyncio.to_thread(clean_old_news)
+        except Exception as e:
+            print(f"Cleanup error: {e}")
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+async def start_janitor():
+    """Запуск фоновой очистки БД"""
+    global _janitor_task
+    _janitor_task = asyncio.create_task(_janitor())
+
+
+@app.on_event("shutdown")
+async def stop_janitor():
+    """Остановка фоновой очистки БД"""
+    if _janitor_task is not None:
+        _janitor_task.cancel()
+
+
+def get_news_from_db(source: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> list:
+    """Получение новостей из БД (одна страница)"""
+    columns = ", ".join(NEWS_COLUMNS)
+    with get_db_connection() as conn:
+        # Кортежи вместо sqlite3.Row: словарь собираем сразу из известного списка колонок
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        if source:
+            cursor.execute(
+                f"SELECT {columns} FROM news WHERE source = ? ORDER BY published_at DESC LIMIT ? OFFSET ?",
+                (source, limit, offset)
+            )
+        else:
+            cursor.execute(
+                f"SELECT {columns} FROM news ORDER BY published_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            )
+        
+        items = [dict(zip(NEWS_COLUMNS, row)) for row in cursor]
     return items
 
 
+def _dedupe_by_id(items: list) -> list:
+    """Удаление дубликатов по id (остаётся первое вхождение)"""
+    seen = set()
+    unique = []
+    for item in items:
+        if item["id"] not in seen:
+            seen.add(item["id"])
+            unique.append(item)
+    return unique
+
+
+# Быстрый разбор RSS/Atom через lxml (feedparser остаётся запасным вариантом)
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    print("⚠️ lxml not installed. Falling back to feedparser for all feeds.")
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+
+def _to_utc_iso(dt: datetime) -> str:
+    """Перевод даты в наивный UTC ISO-формат (как published_parsed у feedparser)"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat()
+
+
+def _elem_text(elem, path: str) -> Optional[str]:
+    """Текст вложенного элемента без лишних пробелов по краям"""
+    child = elem.find(path)
+    if child is None:
+        return None
+    return "".join(child.itertext()).strip()
+
+
+def _rss_entry(elem) -> dict:
+    """Поля записи RSS 2.0 <item>"""
+    published = None
+    pub_date = _elem_text(elem, "pubDate")
+    if pub_date:
+        try:
+            published = _to_utc_iso(parsedate_to_datetime(pub_date))
+        except (TypeError, ValueError):
+            pass
+    return {
+        "id": _elem_text(elem, "guid"),
+        "title": _elem_text(elem, "title") or "",
+        "summary": _elem_text(elem, "description"),
+        "link": _elem_text(elem, "link") or "",
+        "author": _elem_text(elem, "author") or _elem_text(elem, f"{DC_NS}creator"),
+        "published": published,
+    }
+
+
+def _atom_entry(elem) -> dict:
+    """Поля записи Atom <entry>"""
+    published = None
+    pub_date = _elem_text(elem, f"{ATOM_NS}published")
+    if pub_date:
+        try:
+            published = _to_utc_iso(datetime.fromisoformat(pub_date.replace("Z", "+00:00")))
+        except ValueError:
+            pass
+    link = ""
+    for link_elem in elem.iterfind(f"{ATOM_NS}link"):
+        if link_elem.get("rel", "alternate") == "alternate":
+            link = link_elem.get("href", "")
+            break
+    return {
+        "id": _elem_text(elem, f"{ATOM_NS}id"),
+        "title": _elem_text(elem, f"{ATOM_NS}title") or "",
+        "summary": _elem_text(elem, f"{ATOM_NS}summary") or _elem_text(elem, f"{ATOM_NS}content"),
+        "link": link,
+        "author": _elem_text(elem, f"{ATOM_NS}author/{ATOM_NS}name"),
+        "published": published,
+    }
+
+
+def _parse_feed_lxml(content: bytes, limit: Optional[int]) -> Optional[list]:
+    """Потоковый разбор RSS 2.0 / Atom; None, если формат не распознан"""
+    context = etree.iterparse(io.BytesIO(content), events=("start", "end"), resolve_entities=False)
+    _, root = next(context)
+    if root.tag == "rss":
+        entry_tag, extract = "item", _rss_entry
+    elif root.tag == f"{ATOM_NS}feed":
+        entry_tag, extract = f"{ATOM_NS}entry", _atom_entry
+    else:
+        return None
+
+    entries = []
+    for event, elem in context:
+        if event == "end" and elem.tag == entry_tag:
+            entries.append(extract(elem))
+            # Освобождаем память под уже разобранную запись
+            elem.clear()
+            if limit is not None and len(entries) >= limit:
+                break
+    return entries
+
+
+def _parse_feed_feedparser(content: bytes, limit: Optional[int]) -> list:
+    """Разбор произвольной ленты через feedparser"""
+    parsed = feedparser.parse(io.BytesIO(content))
+    entries = []
+    for entry in parsed.entries[:limit]:
+        published = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            published = datetime(*entry.published_parsed[:6]).isoformat()
+
+        # Получаем имя первого автора
+        author = entry.get("author")
+        if hasattr(entry, 'authors') and entry.authors:
+            author = entry.authors[0].get('name', '')
+
+        entries.append({
+            "id": entry.get("id"),
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary"),
+            "link": entry.get("link", ""),
+            "author": author,
+            "published": published,
+        })
+    return entries
+
+
+def parse_feed(content: bytes, limit: Optional[int] = None) -> list:
+    """Разбор ленты в список записей с полями id/title/summary/link/author/published"""
+    if LXML_AVAILABLE:
+        try:
+            entries = _parse_feed_lxml(content, limit)
+        except etree.XMLSyntaxError:
+            entries = None
+        if entries is not None:
+            return entries
+    return _parse_feed_feedparser(content, limit)
+
+
+async def conditional_get(url: str, headers: Optional[dict] = None, **kwargs) -> httpx.Response:
+    """GET с If-None-Match/If-Modified-Since: неизменившиеся ленты отвечают 304 без тела"""
+    headers = dict(headers or {})
+    # Ключ — нормализованный URL, как он окажется в resp.request.url
+    validators = _feed_validators.get(str(httpx.URL(url)), {})
+    # Раз в STALE_AFTER_HOURS ленту забираем целиком, чтобы продлить fetched_at её записей
+    # (иначе при постоянных 304 очистка удалила бы новости, которые ещё есть в ленте)
+    if validators.get("at", "") < stale_cutoff_iso():
+        validators = {}
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "lm" in validators:
+        headers["If-Modified-Since"] = validators["lm"]
+    return await http_client.get(url, headers=headers, **kwargs)
+
+
+def remember_validators(resp: httpx.Response):
+    """Запоминание ETag/Last-Modified ответа 200.
+
+    Вызывается только после успешного разбора тела: иначе следующий запрос получит 304
+    и записи ленты так и не попадут в БД.
+    """
+    url = str(resp.request.url)
+    new_validators = {}
+    if resp.headers.get("ETag"):
+        new_validators["etag"] = resp.headers["ETag"]
+    if resp.headers.get("Last-Modified"):
+        new_validators["lm"] = resp.headers["Last-Modified"]
+    if new_validators:
+        new_validators["at"] = datetime.now().isoformat()
+    if new_validators or url in _feed_validators:
+        _pending_validators[url] = new_validators
+
+
 async def fetch_reddit(subreddits: list) -> list:
     """Получение постов из Reddit"""
     items = []
-    async with httpx.AsyncClient() as client:
-        for subreddit in subreddits:
-            try:
-                url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=10"
-                headers = {"User-Agent": "NewsAggregator/1.0"}
-                resp = await client.get(url, headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    for post in data.get("data", {}).get("children", []):
-                        p = post["data"]
-                        items.append({
-                            "id": f"reddit_{p['id']}",
-                            "source": "reddit",
-                            "source_name": f"r/{subreddit}",
-                            "title": p.get("title", ""),
-                            "description": p.get("selftext", "")[:300] or None,
-                            "url": f"https://reddit.com{p.get('permalink', '')}",
-                            "author": p.get("author"),
-                            "published_at": datetime.fromtimestamp(p.get("created_utc", 0)).isoformat(),
-                            "fetched_at": datetime.now().isoformat()
-                        })
-            except Exception as e:
-                print(f"Reddit error ({subreddit}): {e}")
+    fetched_at = datetime.now().isoformat()  # Одно значение на весь сбор
+    headers = {"User-Agent": "NewsAggregator/1.0"}
+    requests = [
+        conditional_get(f"https://www.reddit.com/r/{subreddit}/hot.json?limit=10", headers=headers)
+        for subreddit in subreddits
+    ]
+    responses = await asyncio.gather(*requests, return_exceptions=True)
+    for subreddit, resp in zip(subreddits, responses):
+        try:
+            if isinstance(resp, Exception):
+                raise resp
+            if resp.status_code == 200:
+                data = resp.json()
+                # Записи ленты добавляем только если разобран весь ответ
+                feed_items = []
+                for post in data.get("data", {}).get("children", []):
+                    p = post["data"]
+                    feed_items.append({
+                        "id": f"reddit_{p['id']}",
+                        "source": "reddit",
+                        "source_name": f"r/{subreddit}",
+                        "title": p.get("title", ""),
+                        "description": p.get("selftext", "")[:300] or None,
+                        "url": f"https://reddit.com{p.get('permalink', '')}",
+                        "author": p.get("author"),
+                        "published_at": datetime.fromtimestamp(p.get("created_utc", 0)).isoformat(),
+                        "fetched_at": fetched_at
+                    })
+                items.extend(feed_items)
+                remember_validators(resp)
+        except Exception as e:
+            print(f"Reddit error ({subreddit}): {e}")
     return items
 
 
 async def fetch_hackernews(keywords: list) -> list:
     """Получение постов из Hacker News через Algolia API"""
     items = []
-    async with httpx.AsyncClient() as client:
-        for keyword in keywords[:3]:  # Ограничим количество запросов
-            try:
-                url = f"https://hn.algolia.com/api/v1/search_by_date?query={keyword}&tags=story&hitsPerPage=10"
-                resp = await client.get(url, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    for hit in data.get("hits", []):
-                        item_id = f"hn_{hit.get('objectID', '')}"
-                        # Проверяем дубликаты
-                        if not any(i["id"] == item_id for i in items):
-                            items.append({
-                                "id": item_id,
-                                "source": "hackernews",
-                                "source_name": "Hacker News",
-                                "title": hit.get("title", ""),
-                                "description": None,
-                                "url": hit.get("url") or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
-                                "author": hit.get("author"),
-                                "published_at": hit.get("created_at"),
-                                "fetched_at": datetime.now().isoformat()
-                            })
-            except Exception as e:
-                print(f"HN error ({keyword}): {e}")
+    fetched_at = datetime.now().isoformat()
+    seen = set()
+    keywords = keywords[:3]  # Ограничим количество запросов
+    requests = [
+        conditional_get(f"https://hn.algolia.com/api/v1/search_by_date?query={keyword}&tags=story&hitsPerPage=10")
+        for keyword in keywords
+    ]
+    responses = await asyncio.gather(*requests, return_exceptions=True)
+    for keyword, resp in zip(keywords, responses):
+        try:
+            if isinstance(resp, Exception):
+                raise resp
+            if resp.status_code == 200:
+                data = resp.json()
+                feed_items = []
+                for hit in data.get("hits", []):
+                    item_id = f"hn_{hit.get('objectID', '')}"
+                    # Проверяем дубликаты
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    feed_items.append({
+                        "id": item_id,
+                        "source": "hackernews",
+                        "source_name": "Hacker News",
+                        "title": hit.get("title", ""),
+                        "description": None,
+                        "url": hit.get("url") or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
+                        "author": hit.get("author"),
+                        "published_at": hit.get("created_at"),
+                        "fetched_at": fetched_at
+                    })
+                items.extend(feed_items)
+                remember_validators(resp)
+        except Exception as e:
+            print(f"HN error ({keyword}): {e}")
     return items
 
 
 async def fetch_rss(feeds: list) -> list:
     """Получение постов из RSS лент"""
     items = []
-    async with httpx.AsyncClient() as client:
-        for feed in feeds:
-            try:
-                resp = await client.get(feed["url"], timeout=10)
-                if resp.status_code == 200:
-                    parsed = feedparser.parse(resp.text)
-                    for entry in parsed.entries[:10]:
-                        pub_date = None
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            pub_date = datetime(*entry.published_parsed[:6]).isoformat()
-                        
-                        items.append({
-                            "id": f"rss_{hash(entry.get('link', '') + feed['name'])}",
-                            "source": "blog",
-                            "source_name": feed["name"],
-                            "title": entry.get("title", ""),
-                            "description": entry.get("summary", "")[:300] if entry.get("summary") else None,
-                            "url": entry.get("link", ""),
-                            "author": entry.get("author"),
-                            "published_at": pub_date,
-                            "fetched_at": datetime.now().isoformat()
-                        })
-            except Exception as e:
-                print(f"RSS error ({feed['name']}): {e}")
+    fetched_at = datetime.now().isoformat()
+    requests = [conditional_get(feed["url"]) for feed in feeds]
+    responses = await asyncio.gather(*requests, return_exceptions=True)
+    for feed, resp in zip(feeds, responses):
+        try:
+            if isinstance(resp, Exception):
+                raise resp
+            if resp.status_code == 200:
+                entries = await asyncio.to_thread(parse_feed, resp.content, 10)
+                feed_items = []
+                for entry in entries:
+                    # Стабильный id между перезапусками: hash() рандомизирован в каждом процессе
+                    entry_key = entry["id"] or entry["link"]
+                    feed_items.append({
+                        "id": "rss_" + hashlib.blake2b((entry_key + feed["name"]).encode(), digest_size=8).hexdigest(),
+                        "source": "blog",
+                        "source_name": feed["name"],
+                        "title": entry["title"],
+                        "description": entry["summary"][:300] if entry["summary"] else None,
+                        "url": entry["link"],
+                        "author": entry["author"],
+                        "published_at": entry["published"],
+                        "fetched_at": fetched_at
+                    })
+                items.extend(feed_items)
+                remember_validators(resp)
+        except Exception as e:
+            print(f"RSS error ({feed['name']}): {e}")
     return items
 
 
 async def fetch_arxiv() -> list:
     """Получение статей из arXiv (категория cs.AI и cs.LG)"""
     items = []
-    async with httpx.AsyncClient() as client:
-        try:
-            url = "https://export.arxiv.org/api/query?search_query=cat:cs.AI+OR+cat:cs.LG&start=0&max_results=20&sortBy=submittedDate&sortOrder=descending"
-            resp = await client.get(url, timeout=15)
-            if resp.status_code == 200:
-                parsed = feedparser.parse(resp.text)
-                for entry in parsed.entries:
-                    pub_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub_date = datetime(*entry.published_parsed[:6]).isoformat()
-                    
-                    # Получаем имя первого автора
-                    author = None
-                    if hasattr(entry, 'authors') and entry.authors:
-                        author = entry.authors[0].get('name', '')
-                    
-                    items.append({
-                        "id": f"arxiv_{entry.get('id', '').split('/')[-1]}",
-                        "source": "arxiv",
-                        "source_name": "arXiv",
-                        "title": entry.get("title", "").replace("\n", " "),
-                        "description": entry.get("summary", "")[:400].replace("\n", " ") if entry.get("summary") else None,
-                        "url": entry.get("link", ""),
-                        "author": author,
-                        "published_at": pub_date,
-                        "fetched_at": datetime.now().isoformat()
-                    })
-        except Exception as e:
-            print(f"arXiv error: {e}")
+    fetched_at = datetime.now().isoformat()
+    try:
+        url = "https://export.arxiv.org/api/query?search_query=cat:cs.AI+OR+cat:cs.LG&start=0&max_results=20&sortBy=submittedDate&sortOrder=descending"
+        resp = await conditional_get(url, timeout=15)
+        if resp.status_code == 200:
+            entries = await asyncio.to_thread(parse_feed, resp.content)
+            feed_items = []
+            for entry in entries:
+                feed_items.append({
+                    "id": f"arxiv_{(entry['id'] or '').split('/')[-1]}",
+                    "source": "arxiv",
+                    "source_name": "arXiv",
+                    "title": entry["title"].replace("\n", " "),
+                    "description": entry["summary"][:400].replace("\n", " ") if entry["summary"] else None,
+                    "url": entry["link"],
+                    "author": entry["author"],
+                    "published_at": entry["published"],
+                    "fetched_at": fetched_at
+                })
+            items.extend(feed_items)
+            remember_validators(resp)
+    except Exception as e:
+        print(f"arXiv error: {e}")
     return items
 
 
@@ -319,7 +722,27 @@ async def fetch_all_sources() -> list:
     for result in results:
         all_items.extend(result)
     
-    return all_items
+    return _dedupe_by_id(all_items)
+
+
+async def _do_refresh() -> str:
+    """Сбор свежих новостей и запись в БД; возвращает время обновления"""
+    # Получаем свежие данные
+    items = await fetch_all_sources()
+    
+    # Сохраняем в БД
+    await asyncio.to_thread(save_news_items, items)
+    
+    # Валидаторы (только успешно разобранных лент) сохраняем после записи новостей:
+    # при 304 ленту не разбираем, а её записи уже лежат в БД
+    validators = _pending_validators.copy()
+    _pending_validators.clear()
+    await asyncio.to_thread(save_feed_validators, validators)
+    
+    # Обновляем время
+    now = datetime.now().isoformat()
+    await asyncio.to_thread(set_last_updated, now)
+    return now
 
 
 @app.get("/")
@@ -331,9 +754,12 @@ async def index():
 @app.get("/api/news")
 async def get_news(
     source: Optional[str] = Query(None, description="Фильтр по источнику"),
-    force_refresh: bool = Query(False, description="Принудительное обновление")
+    force_refresh: bool = Query(False, description="Принудительное обновление"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+    offset: int = Query(0, ge=0, description="Смещение")
 ):
     """Получение новостей"""
+    global _refresh_task
     config = load_config()
     
     # Проверяем нужно ли обновить
@@ -350,22 +776,14 @@ async def get_news(
             should_refresh = True
     
     if should_refresh or not last_updated:
-        # Получаем свежие данные
-        items = await fetch_all_sources()
-        
-        # Сохраняем в БД
-        save_news_items(items)
-        
-        # Очищаем старые записи
-        clean_old_news()
-        
-        # Обновляем время
-        now = datetime.now().isoformat()
-        set_last_updated(now)
-        last_updated = now
+        # Одновременные запросы ждут одно и то же обновление, а не запускают своё
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.create_task(_do_refresh())
+        # shield: отключение одного клиента не должно отменять общее обновление
+        last_updated = await asyncio.shield(_refresh_task)
     
-    # Получаем из БД
-    items = get_news_from_db(source)
+    # Получаем из БД (блокирующие вызовы SQLite выносим из event loop)
+    items = await asyncio.to_thread(get_news_from_db, source, limit, offset)
     
     return {
         "items": items,
@@ -374,10 +792,22 @@ async def get_news(
     }
 
 
+@app.get("/api/news.msgpack")
+async def get_news_msgpack(
+    source: Optional[str] = Query(None, description="Фильтр по источнику"),
+    force_refresh: bool = Query(False, description="Принудительное обновление"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+    offset: int = Query(0, ge=0, description="Смещение")
+):
+    """Получение новостей в формате MessagePack"""
+    payload = await get_news(source=source, force_refresh=force_refresh, limit=limit, offset=offset)
+    return Response(content=msgpack.packb(payload), media_type="application/msgpack")
+
+
 @app.post("/api/refresh")
 async def refresh_news():
     """Принудительное обновление новостей"""
-    return await get_news(force_refresh=True)
+    return await get_news(source=None, force_refresh=True, limit=DEFAULT_PAGE_SIZE, offset=0)
 
 
 @app.get("/api/config")
@@ -389,7 +819,17 @@ async def get_config():
 @app.post("/api/config")
 async def update_config(config: dict):
     """Обновление конфигурации"""
+    # Имя RSS-ленты входит в source_name и id её записей: после переименования ленту нужно
+    # разобрать заново, а не получить 304 по старым валидаторам
+    old_names = {feed.get("url"): feed.get("name") for feed in load_config().get("rss_feeds", [])}
+    renamed = {
+        feed["url"]: old_names[feed["url"]] for feed in config.get("rss_feeds", [])
+        if feed.get("url") in old_names and old_names[feed["url"]] != feed.get("name")
+    }
     save_config(config)
+    await asyncio.to_thread(clear_feed_validators, list(renamed))
+    # Записи под старым именем иначе висели бы рядом с новыми до истечения TTL
+    await asyncio.to_thread(delete_blog_news, list(renamed.values()))
     return {"status": "ok"}
 
 
@@ -400,16 +840,14 @@ async def get_author_preset():
 
 
 @app.get("/api/stats")
-async def get_stats():
-    """Статистика базы данных"""
-    conn = get_db_connection()
-    cursor = conn.execute("SELECT COUNT(*) as total FROM news")
-    total = cursor.fetchone()["total"]
-    
-    cursor = conn.execute("SELECT source, COUNT(*) as count FROM news GROUP BY source")
-    by_source = {row["source"]: row["count"] for row in cursor.fetchall()}
-    
-    conn.close()
+def get_stats():
+    """Статистика базы данных (sync: FastAPI выполняет её в пуле потоков)"""
+    with get_db_connection() as conn:
+        cursor = conn.execute("SELECT COUNT(*) as total FROM news")
+        total = cursor.fetchone()["total"]
+        
+        cursor = conn.execute("SELECT source, COUNT(*) as count FROM news GROUP BY source")
+        by_source = {row["source"]: row["count"] for row in cursor.fetchall()}
     
     return {
         "total_items": total,
@@ -426,6 +864,36 @@ except ImportError:
     TRANSLATOR_AVAILABLE = False
     print("⚠️ deep-translator not installed. Translation disabled.")
 
+# Собственный пул для запросов к Google Translate: они медленные и без таймаута,
+# поэтому не должны занимать общий пул потоков, в котором работают запросы к БД
+_translate_executor = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate")
+
+
+@app.on_event("shutdown")
+def stop_translate_executor():
+    """Остановка пула потоков перевода"""
+    _translate_executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def translate_text(text: str, target_lang: str) -> str:
+    """Перевод одной строки (повторяющиеся тексты берутся из кэша)"""
+    # Отдельный экземпляр на вызов: GoogleTranslator хранит параметры запроса в себе
+    # и не потокобезопасен
+    return GoogleTranslator(source='en', target=target_lang).translate(text)
+
+
+def _translate_chunk(texts: list, target_lang: str) -> list:
+    """Перевод порции строк; None для строк, которые перевести не удалось"""
+    results = []
+    for text in texts:
+        try:
+            results.append(translate_text(text, target_lang))
+        except Exception as e:
+            print(f"Translation error: {e}")
+            results.append(None)
+    return results
+
 
 @app.post("/api/translate")
 async def translate_news(data: dict):
@@ -440,27 +908,35 @@ async def translate_news(data: dict):
         # Возвращаем оригинал
         return {"items": items}
     
-    translated_items = []
-    translator = GoogleTranslator(source='en', target=target_lang)
+    # Собираем все заголовки и описания в один список: (индекс новости, поле)
+    texts = []
+    slots = []
+    for index, item in enumerate(items):
+        for field in ("title", "description"):
+            if item.get(field):
+                texts.append(item[field])
+                slots.append((index, field))
     
-    for item in items:
-        try:
-            translated_item = item.copy()
-            
-            # Переводим заголовок
-            if item.get("title"):
-                translated_item["title_original"] = item["title"]
-                translated_item["title"] = translator.translate(item["title"])
-            
-            # Переводим описание
-            if item.get("description"):
-                translated_item["description_original"] = item["description"]
-                translated_item["description"] = translator.translate(item["description"])
-            
-            translated_items.append(translated_item)
-        except Exception as e:
-            print(f"Translation error: {e}")
-            translated_items.append(item)
+    # Порции переводим параллельно в отдельном пуле потоков
+    loop = asyncio.get_running_loop()
+    chunks = [texts[i:i + TRANSLATE_CHUNK_SIZE] for i in range(0, len(texts), TRANSLATE_CHUNK_SIZE)]
+    chunk_results = await asyncio.gather(
+        *[loop.run_in_executor(_translate_executor, _translate_chunk, chunk, target_lang) for chunk in chunks]
+    )
+    translations = [text for chunk in chunk_results for text in chunk]
+    
+    translated_items = [item.copy() for item in items]
+    failed = set()
+    for (index, field), translation in zip(slots, translations):
+        if translation is None:
+            failed.add(index)
+            continue
+        translated_items[index][f"{field}_original"] = items[index][field]
+        translated_items[index][field] = translation
+    
+    # Новость, которую не удалось перевести целиком, отдаём в оригинале
+    for index in failed:
+        translated_items[index] = items[index]
     
     return {"items": translated_items}
 
@@ -10,6 +10,8 @@ let newsData = [];
 let originalNewsData = []; // Оригинальные данные для перевода
 let currentLang = localStorage.getItem('lang') || 'en';
 let currentTheme = localStorage.getItem('theme') || 'dark';
+let newsController = null; // AbortController текущего запроса /api/news
+let translateSeq = 0; // Номер актуального перевода: результаты устаревших отбрасываются
 
 // DOM Elements
 const newsGrid = document.getElementById('newsGrid');
@@ -90,6 +92,7 @@ function setupEventListeners() {
         if (newLang === 'ru' && originalNewsData.length > 0) {
             await translateNews();
         } else if (newLang === 'en') {
+            translateSeq++; // Отменяем незавершённый перевод
             newsData = [...originalNewsData];
             renderNews();
         }
@@ -101,7 +104,8 @@ function setupEventListeners() {
             filterBtns.forEach(b => b.classList.remove('active'));
             btn.classList.add('active');
             currentFilter = btn.dataset.source;
-            renderNews();
+            // Фильтрация и лимит страницы выполняются на сервере
+            loadNews();
         });
     });
 
@@ -135,11 +139,20 @@ function setupEventListeners() {
 
 // API Functions
 async function loadNews(forceRefresh = false) {
+    // Ответ на предыдущий запрос (например, другой фильтр) больше не нужен
+    if (newsController) newsController.abort();
+    const controller = new AbortController();
+    newsController = controller;
+    translateSeq++;
+
     try {
         const t = translations[currentLang];
         newsGrid.innerHTML = `<div class="loading">${t.loading}</div>`;
-        const url = forceRefresh ? '/api/news?force_refresh=true' : '/api/news';
-        const response = await fetch(url);
+        const params = new URLSearchParams();
+        if (currentFilter !== 'all') params.set('source', currentFilter);
+        if (forceRefresh) params.set('force_refresh', 'true');
+        const query = params.toString();
+        const response = await fetch(query ? `/api/news?${query}` : '/api/news', { signal: controller.signal });
         const data = await response.json();
         originalNewsData = data.items || [];
         newsData = [...originalNewsData];
@@ -151,6 +164,7 @@ async function loadNews(forceRefresh = false) {
             renderNews();
         }
     } catch (error) {
+        if (error.name === 'AbortError') return;
         console.error('Error loading news:', error);
         const t = translations[currentLang];
         newsGrid.innerHTML = `<div class="loading error">${t.error}</div>`;
@@ -158,6 +172,8 @@ async function loadNews(forceRefresh = false) {
 }
 
 async function translateNews() {
+    const seq = ++translateSeq;
+    const sourceItems = originalNewsData;
     const t = translations[currentLang];
     newsGrid.innerHTML = `<div class="loading">${t.translating}</div>`;
 
@@ -166,24 +182,26 @@ async function translateNews() {
         const batchSize = 10;
         const translatedItems = [];
 
-        for (let i = 0; i < originalNewsData.length; i += batchSize) {
-            const batch = originalNewsData.slice(i, i + batchSize);
+        for (let i = 0; i < sourceItems.length; i += batchSize) {
+            const batch = sourceItems.slice(i, i + batchSize);
             const response = await fetch('/api/translate', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ items: batch, target_lang: 'ru' })
             });
             const data = await response.json();
+            if (seq !== translateSeq) return; // Новости перезагружены или язык сменён
             translatedItems.push(...(data.items || batch));
 
             // Update progress
-            const progress = Math.min(100, Math.round((i + batchSize) / originalNewsData.length * 100));
+            const progress = Math.min(100, Math.round((i + batchSize) / sourceItems.length * 100));
             newsGrid.innerHTML = `<div class="loading">${t.translating} ${progress}%</div>`;
         }
 
         newsData = translatedItems;
         renderNews();
     } catch (error) {
+        if (seq !== translateSeq) return;
         console.error('Translation error:', error);
         newsData = [...originalNewsData];
         renderNews();
@@ -238,16 +256,14 @@ async function loadAuthorPreset() {
 // Render Functions
 function renderNews() {
     const t = translations[currentLang];
-    const filtered = currentFilter === 'all'
-        ? newsData
-        : newsData.filter(item => item.source === currentFilter);
 
-    if (filtered.length === 0) {
+    // newsData уже отфильтрован сервером по currentFilter
+    if (newsData.length === 0) {
         newsGrid.innerHTML = `<div class="loading">${t.noNews}</div>`;
         return;
     }
 
-    newsGrid.innerHTML = filtered.map(item => createNewsCard(item)).join('');
+    newsGrid.innerHTML = newsData.map(item => createNewsCard(item)).join('');
 
     // Add click handlers
     document.querySelectorAll('.news-card').forEach(card => {